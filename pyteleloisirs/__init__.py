@@ -1 +1,46 @@
-from .pyteleloisirs import *
+import importlib
+
+
+__version__ = '3.6'
+
+# Constants are exposed as read-only copies: settings such as
+# HTTP_CACHE_PATH or MAX_RETRIES have to be changed on
+# pyteleloisirs.pyteleloisirs
+__all__ = [
+    'BASE_URL',
+    'MAX_CONCURRENT_REQUESTS',
+    'async_determine_channel',
+    'async_get_channels',
+    'async_get_current_program',
+    'async_get_program_guide',
+    'async_get_program_guides',
+    'async_set_summary',
+    'extract_program_summary',
+    'get_channels',
+    'get_current_program',
+    'get_current_program_progress',
+    'get_program_duration',
+    'get_program_guide',
+    'get_program_guides',
+    'get_remaining_time',
+    'resize_program_image',
+]
+
+
+def __getattr__(name):
+    '''
+    Import the implementation (and with it aiohttp, bs4...) on first use
+    '''
+    if name == 'pyteleloisirs':
+        return importlib.import_module('.pyteleloisirs', __name__)
+    if name not in __all__:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+    module = importlib.import_module('.pyteleloisirs', __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | {'pyteleloisirs'})
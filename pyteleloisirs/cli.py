@@ -1,10 +1,8 @@
-#!/usr/bin/env python
 # coding: utf-8
 
 import asyncio
 import argparse
 import datetime
-import logging
 import pprint
 
 import pyteleloisirs
@@ -43,7 +41,7 @@ def humanize(program_data, show_summary=False):
             print('{}-{}: {}'.format(start, end, program.get('name')))
 
 
-async def main():
+async def async_main():
     '''
     Main entrypoint
     '''
@@ -58,7 +56,11 @@ async def main():
         pprint.pprint(res)
 
 
-if __name__ == '__main__':
+def main():
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(main())
+    loop.run_until_complete(async_main())
     loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,56 +2,224 @@
 # coding: utf-8
 
 import asyncio
+import bisect
+import codecs
+import contextlib
 import datetime
+import functools
 import logging
+import os
 import re
+import sqlite3
+import time
+import traceback
+
+import aiohttp
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+from rapidfuzz import fuzz, process, utils
+from selectolax.lexbor import LexborHTMLParser
 
 
 _CACHE = {}
 _LOGGER = logging.getLogger(__name__)
 BASE_URL = 'http://www.programme-tv.net'
+MAX_CONCURRENT_REQUESTS = 32
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+# On-disk HTTP cache used for conditional requests. Pass http_cache=False to
+# the public functions to bypass it, or set pyteleloisirs.pyteleloisirs.
+# HTTP_CACHE_PATH to None to disable it altogether.
+HTTP_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'pyteleloisirs.sqlite')
+HTTP_CACHE_MAX_ENTRIES = 512
+_HTTP_CACHE_READY = set()
+_IMG_RES_RE = re.compile(r'.+/(\d+)x(\d+)/.+')
+_CHANNEL_LINK_SEL = soupsieve.compile(
+    'li > a:first-child[href^="/programme/chaine"]')
+_CARD_SEL = soupsieve.compile('div.singleBroadcastCard')
+_CARD_TITLE_SEL = soupsieve.compile('a.singleBroadcastCard-title')
+_CARD_GENRE_SEL = soupsieve.compile('div.singleBroadcastCard-genre')
+_CARD_DURATION_SEL = soupsieve.compile(
+    'span.singleBroadcastCard-durationContent')
+_CARD_HOUR_SEL = soupsieve.compile('div.singleBroadcastCard-hour')
+_CARD_IMG_SEL = soupsieve.compile('img.apply-ratio')
+
+
+def _http_cache_connect():
+    '''
+    Open the on-disk HTTP cache, creating its schema on first use
+    '''
+    if HTTP_CACHE_PATH not in _HTTP_CACHE_READY:
+        os.makedirs(os.path.dirname(HTTP_CACHE_PATH), exist_ok=True)
+        with contextlib.closing(sqlite3.connect(HTTP_CACHE_PATH)) as conn, \
+                conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS http_cache ('
+                         'url TEXT PRIMARY KEY, etag TEXT, '
+                         'last_modified TEXT, charset TEXT, body BLOB, '
+                         'last_used REAL)')
+        _HTTP_CACHE_READY.add(HTTP_CACHE_PATH)
+    return sqlite3.connect(HTTP_CACHE_PATH)
+
+
+def _http_cache_get(url):
+    '''
+    Get the cached (etag, last_modified, charset, body) of a URL
+    '''
+    if not HTTP_CACHE_PATH:
+        return
+    try:
+        with contextlib.closing(_http_cache_connect()) as conn, conn:
+            return conn.execute(
+                'SELECT etag, last_modified, charset, body FROM http_cache '
+                'WHERE url = ?', (url,)).fetchone()
+    except (OSError, sqlite3.Error) as exc:
+        _LOGGER.debug('Could not read the HTTP cache: %s', exc)
+
+
+def _http_cache_set(url, etag, last_modified, charset, body):
+    '''
+    Store a response in the on-disk HTTP cache and evict the least recently
+    used entries above HTTP_CACHE_MAX_ENTRIES
+    '''
+    if not HTTP_CACHE_PATH:
+        return
+    try:
+        with contextlib.closing(_http_cache_connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO http_cache '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, charset, body, time.time()))
+            conn.execute(
+                'DELETE FROM http_cache WHERE url NOT IN ('
+                'SELECT url FROM http_cache ORDER BY last_used DESC '
+                'LIMIT ?)', (HTTP_CACHE_MAX_ENTRIES,))
+    except (OSError, sqlite3.Error) as exc:
+        _LOGGER.debug('Could not write the HTTP cache: %s', exc)
+
+
+async def _async_get_body(session, url, retries=MAX_RETRIES,
+                          http_cache=False):
+    '''
+    Perform a GET web request and return the raw response body along with
+    its charset (if announced). Transient failures are retried with an
+    exponential backoff.
+    If http_cache is set, the response is validated against the on-disk
+    cache with ETag/If-Modified-Since and the cached body is returned when
+    the server replies 304 Not Modified.
+    '''
+    # sqlite does blocking disk I/O, keep it off the event loop
+    loop = asyncio.get_event_loop()
+    cached = None
+    if http_cache:
+        cached = await loop.run_in_executor(None, _http_cache_get, url)
+    headers = {}
+    if cached:
+        etag, last_modified, _, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    for attempt in range(retries + 1):
+        _LOGGER.debug('GET %s', url)
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status >= 500:
+                    resp.raise_for_status()
+                if resp.status == 304 and cached:
+                    _LOGGER.debug('%s has not been modified.', url)
+                    # Store it again to mark the entry as recently used
+                    await loop.run_in_executor(None, _http_cache_set, url,
+                                               *cached)
+                    return cached[3], cached[2]
+                body = await resp.read()
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+                if http_cache and resp.status == 200 and \
+                        (etag or last_modified):
+                    await loop.run_in_executor(
+                        None, _http_cache_set, url, etag, last_modified,
+                        resp.charset, body)
+                return body, resp.charset
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            if attempt >= retries:
+                raise
+            delay = RETRY_BACKOFF * 2 ** attempt
+            _LOGGER.debug('GET %s failed (%s). Retrying in %ss', url, exc,
+                          delay)
+            await asyncio.sleep(delay)
+
+
+def _decode_body(body, charset):
+    '''
+    Decode a response body for parsers that only understand UTF-8 bytes.
+    UTF-8 bodies are returned as is, others are decoded using the announced
+    charset or, if there is none, the one declared or detected in the page.
+    '''
+    if charset:
+        try:
+            if codecs.lookup(charset).name == 'utf-8':
+                return body
+            return body.decode(charset, errors='replace')
+        except LookupError:
+            _LOGGER.debug('Unknown charset %s. Detect it instead.', charset)
+    try:
+        body.decode('utf-8')
+        return body
+    except UnicodeDecodeError:
+        return UnicodeDammit(body, is_html=True).unicode_markup
 
 
-async def _async_request_soup(url):
+async def _async_request_soup(url, session=None, http_cache=True):
     '''
     Perform a GET web request and return a bs4 parser
     '''
-    from bs4 import BeautifulSoup
-    import aiohttp
-    _LOGGER.debug('GET %s', url)
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get(url)
-        text = await resp.text()
-        return BeautifulSoup(text, 'html.parser')
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await _async_request_soup(url, session, http_cache)
+    body, charset = await _async_get_body(session, url,
+                                          http_cache=http_cache)
+    # Parse in a worker thread to keep the event loop responsive
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(BeautifulSoup, body, features='lxml',
+                                from_encoding=charset))
 
 
-async def async_determine_channel(channel):
+async def async_determine_channel(channel, http_cache=True):
     '''
     Check whether the current channel is correct. If not try to determine it
-    using fuzzywuzzy
+    using rapidfuzz
     '''
-    from fuzzywuzzy import process
-    channel_data = await async_get_channels()
+    channel_data = await async_get_channels(http_cache=http_cache)
     if not channel_data:
         _LOGGER.error('No channel data. Cannot determine requested channel.')
         return
-    channels = [c for c in channel_data.get('data', {}).keys()]
+    channels = channel_data.get('data', {})
     if channel in channels:
         return channel
-    else:
-        res = process.extractOne(channel, channels)[0]
-        _LOGGER.debug('No direct match found for %s. Resort to guesswork.'
-                      'Guessed %s', channel, res)
-        return res
+    # Guesses are discarded whenever the channel list is refreshed
+    matches = _CACHE.setdefault('channel_matches', {})
+    if channel in matches:
+        return matches[channel]
+    res = process.extractOne(channel, list(channels), scorer=fuzz.WRatio,
+                             processor=utils.default_process)[0]
+    _LOGGER.debug('No direct match found for %s. Resort to guesswork.'
+                  'Guessed %s', channel, res)
+    matches[channel] = res
+    return res
 
 
-async def async_get_channels(no_cache=False, refresh_interval=4):
+async def async_get_channels(no_cache=False, refresh_interval=4,
+                             http_cache=True):
     '''
     Get channel list and corresponding urls
     '''
     # Check cache
-    now = datetime.datetime.now()
-    max_cache_age = datetime.timedelta(hours=refresh_interval)
+    now = time.monotonic()
+    max_cache_age = refresh_interval * 3600
     if not no_cache and 'channels' in _CACHE:
         cache = _CACHE.get('channels')
         cache_age = cache.get('last_updated')
@@ -61,22 +229,14 @@ async def async_get_channels(no_cache=False, refresh_interval=4):
         else:
             _LOGGER.debug('Found outdated channel list in cache. Update it.')
             _CACHE.pop('channels')
-    soup = await _async_request_soup(BASE_URL + '/plan.html')
+    soup = await _async_request_soup(BASE_URL + '/plan.html',
+                                     http_cache=http_cache)
     channels = {}
-    for li_item in soup.find_all('li'):
-        try:
-            child = li_item.findChild()
-            if not child or child.name != 'a':
-                continue
-            href = child.get('href')
-            if not href or not href.startswith('/programme/chaine'):
-                continue
-            channels[child.get('title')] = BASE_URL + href
-        except Exception as exc:
-            _LOGGER.error('Exception occured while fetching the channel '
-                          'list: %s', exc)
+    for link in _CHANNEL_LINK_SEL.select(soup):
+        channels[link.get('title')] = BASE_URL + link.get('href')
     if channels:
         _CACHE['channels'] = {'last_updated': now, 'data': channels}
+        _CACHE.pop('channel_matches', None)
         return _CACHE['channels']
 
 
@@ -84,7 +244,7 @@ def resize_program_image(img_url, img_size=300):
     '''
     Resize a program's thumbnail to the desired dimension
     '''
-    match = re.match(r'.+/(\d+)x(\d+)/.+', img_url)
+    match = _IMG_RES_RE.match(img_url)
     if not match:
         _LOGGER.warning('Could not compute current image resolution of %s',
                         img_url)
@@ -93,10 +253,8 @@ def resize_program_image(img_url, img_size=300):
     res_y = int(match.group(2))
     # aspect_ratio = res_x / res_y
     target_res_y = int(img_size * res_y / res_x)
-    return re.sub(
-        r'{}x{}'.format(res_x, res_y),
-        r'{}x{}'.format(img_size, target_res_y),
-        img_url)
+    return '{}{}x{}{}'.format(img_url[:match.start(1)], img_size,
+                              target_res_y, img_url[match.end(2):])
 
 
 def get_current_program_progress(program):
@@ -148,43 +306,88 @@ def extract_program_summary(data):
     '''
     Extract the summary data from a program's detail page
     '''
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(data, 'html.parser')
-    try:
-        return soup.\
-            find('p', {'class': 'synopsis-text'}).\
-            text.\
-            strip()
-    except Exception:
+    tree = LexborHTMLParser(data)
+    node = tree.css_first('p.synopsis-text')
+    if node is None:
+        node = tree.css_first('div.episode-synopsis div:last-child')
+    if node is not None:
+        return node.text().strip()
+    title = tree.css_first('h1')
+    if title is not None:
         _LOGGER.info('No summary found for program: %s',
-                     soup.find('h1').text.strip())
-    finally:
+                     title.text().strip())
+    else:
         _LOGGER.info('No summary found nor program name')
-
     return "No summary"
 
 
-async def async_set_summary(program):
+async def _async_fetch_summary(url, session, semaphore=None,
+                               refresh_interval=4, no_cache=False):
+    '''
+    Get the summary from a program's detail page. Summaries are cached per
+    detail page URL.
+    '''
+    now = time.monotonic()
+    max_cache_age = refresh_interval * 3600
+    cache = _CACHE.get('summaries', {}).get(url)
+    if not no_cache and cache and \
+            now - cache.get('last_updated') < max_cache_age:
+        return cache.get('data')
+    if semaphore is None:
+        body, charset = await _async_get_body(session, url)
+    else:
+        async with semaphore:
+            body, charset = await _async_get_body(session, url)
+    loop = asyncio.get_event_loop()
+    summary = await loop.run_in_executor(
+        None, lambda: extract_program_summary(_decode_body(body, charset)))
+    if 'summaries' not in _CACHE:
+        _CACHE['summaries'] = {}
+    _CACHE['summaries'][url] = {'last_updated': now, 'data': summary}
+    return summary
+
+
+async def async_set_summary(program, session=None, semaphore=None):
     '''
     Set a program's summary
     '''
-    import aiohttp
-    async with aiohttp.ClientSession() as session:
-        resp = await session.get(program.get('url'))
-        text = await resp.text()
-        summary = extract_program_summary(text)
-        program['summary'] = summary
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await async_set_summary(program, session, semaphore)
+    url = program.get('url')
+    if not url:
         return program
+    try:
+        program['summary'] = await _async_fetch_summary(url, session,
+                                                        semaphore)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        _LOGGER.error('Failed to fetch the summary of %s: %s',
+                      program.get('name'), exc)
+    return program
 
 
-async def async_get_program_guide(channel, no_cache=False, refresh_interval=4):
+def _create_session():
+    '''
+    Create an HTTP session whose connections are kept alive and shared
+    between all the requests of a refresh
+    '''
+    connector = aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=30)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def async_get_program_guide(channel, no_cache=False, refresh_interval=4,
+                                  max_concurrent=MAX_CONCURRENT_REQUESTS,
+                                  session=None, http_cache=True,
+                                  semaphore=None, summary_tasks=None):
     '''
     Get the program data for a channel
+    semaphore and summary_tasks (detail page URL -> summary task) can be
+    shared between several calls to throttle and deduplicate their
+    summary fetches together.
     '''
-    chan = await async_determine_channel(channel)
-    now = datetime.datetime.now()
-    today = datetime.date.today()
-    max_cache_age = datetime.timedelta(hours=refresh_interval)
+    chan = await async_determine_channel(channel, http_cache)
+    now = time.monotonic()
+    max_cache_age = refresh_interval * 3600
     if not no_cache and 'guide' in _CACHE and _CACHE.get('guide').get(chan):
         cache = _CACHE.get('guide').get(chan)
         cache_age = cache.get('last_updated')
@@ -194,25 +397,83 @@ async def async_get_program_guide(channel, no_cache=False, refresh_interval=4):
         else:
             _LOGGER.debug('Found outdated program guide in cache. Update it.')
             _CACHE['guide'].pop(chan)
-    chans = await async_get_channels()
+    chans = await async_get_channels(http_cache=http_cache)
     url = chans.get('data', {}).get(chan)
     if not url:
         _LOGGER.error('Could not determine URL for %s', chan)
         return
-    soup = await _async_request_soup(url)
+    if session is None:
+        async with _create_session() as session:
+            return await _async_fetch_program_guide(
+                chan, url, session, now, max_concurrent=max_concurrent,
+                refresh_interval=refresh_interval, no_cache=no_cache,
+                http_cache=http_cache, semaphore=semaphore,
+                summary_tasks=summary_tasks)
+    return await _async_fetch_program_guide(
+        chan, url, session, now, max_concurrent=max_concurrent,
+        refresh_interval=refresh_interval, no_cache=no_cache,
+        http_cache=http_cache, semaphore=semaphore,
+        summary_tasks=summary_tasks)
+
+
+async def async_get_program_guides(channels, no_cache=False,
+                                   refresh_interval=4,
+                                   max_concurrent=MAX_CONCURRENT_REQUESTS,
+                                   http_cache=True):
+    '''
+    Get the program data for several channels at once. Returns a dict
+    mapping each requested channel to its program guide.
+    '''
+    channels = list(channels)
+    # Fetch the channel list once up front instead of once per channel
+    await async_get_channels(http_cache=http_cache)
+    # Summary fetches are throttled and deduplicated across all channels
+    semaphore = asyncio.BoundedSemaphore(max_concurrent)
+    summary_tasks = {}
+    async with _create_session() as session:
+        guides = await asyncio.gather(*[
+            async_get_program_guide(chan, no_cache, refresh_interval,
+                                    max_concurrent, session, http_cache,
+                                    semaphore, summary_tasks)
+            for chan in channels])
+    return dict(zip(channels, guides))
+
+
+async def _async_fetch_program_guide(chan, url, session, now,
+                                     max_concurrent=MAX_CONCURRENT_REQUESTS,
+                                     refresh_interval=4, no_cache=False,
+                                     http_cache=True, semaphore=None,
+                                     summary_tasks=None):
+    '''
+    Fetch and parse a channel's program guide, including the program
+    summaries, reusing the provided HTTP session
+    '''
+    today = datetime.date.today()
+    # Drop the expired summaries so that the cache does not grow unbounded
+    max_cache_age = refresh_interval * 3600
+    for prog_url, cache in list(_CACHE.get('summaries', {}).items()):
+        if now - cache.get('last_updated') >= max_cache_age:
+            _CACHE['summaries'].pop(prog_url)
+    soup = await _async_request_soup(url, session, http_cache)
+    if semaphore is None:
+        semaphore = asyncio.BoundedSemaphore(max_concurrent)
+    # Programs sharing a detail page (e.g. episodes of a series, possibly
+    # on other channels) share a single summary request
+    if summary_tasks is None:
+        summary_tasks = {}
     programs = []
-    for prg_item in soup.find_all('div', {'class': 'singleBroadcastCard'}):
+    prog_urls = []
+    for prg_item in _CARD_SEL.select(soup):
         try:
-            prog_info = prg_item.find('a', {'class': 'singleBroadcastCard-infos'})
-            prog_title = prg_item.find('a', {'class': 'singleBroadcastCard-title'})
+            prog_title = _CARD_TITLE_SEL.select_one(prg_item)
             prog_name = prog_title.text.strip()
             prog_url = prog_title.get('href')
             if not prog_url:
                 _LOGGER.warning('Failed to retrive the detail URL for program %s. '
                                 'The summary will be empty', prog_name)
-            prog_type = prg_item.find('div', {'class': 'singleBroadcastCard-genre'}).text.strip()
-            prog_times = prg_item.find('span', {'class': 'singleBroadcastCard-durationContent'}).text.strip()
-            start_time = prg_item.find('div', {'class': 'singleBroadcastCard-hour'}).text.strip().split('h')
+            prog_type = _CARD_GENRE_SEL.select_one(prg_item).text.strip()
+            prog_times = _CARD_DURATION_SEL.select_one(prg_item).text.strip()
+            start_time = _CARD_HOUR_SEL.select_one(prg_item).text.strip().split('h')
             start_time = [ int(i) for i in start_time ]
             duration = prog_times.replace('min', '').split('h')
             if len(duration) == 1:
@@ -220,39 +481,78 @@ async def async_get_program_guide(channel, no_cache=False, refresh_interval=4):
             elif not duration[1]:
                 duration[1] = 0
             duration = [ int(i) for i in duration ]
-            prog_start = datetime.datetime.combine(today, datetime.time(start_time[0], start_time[1]))
-            prog_end = prog_start + datetime.timedelta(hours=duration[0], minutes=duration[1])
-            img = prg_item.find('img', {'class': 'apply-ratio'})
+            prog_start = datetime.datetime(today.year, today.month, today.day,
+                                           start_time[0], start_time[1])
+            prog_end = prog_start + datetime.timedelta(
+                minutes=duration[0] * 60 + duration[1])
+            img = _CARD_IMG_SEL.select_one(prg_item)
             prog_img = img.get('data-src') if img else None
-            programs.append(
-                {'name': prog_name, 'type': prog_type, 'img': prog_img,
-                 'url': prog_url, 'summary': None, 'start_time': prog_start,
-                 'end_time': prog_end})
+            prog = {'name': prog_name, 'type': prog_type, 'img': prog_img,
+                    'url': prog_url, 'summary': None,
+                    'start_time': prog_start, 'end_time': prog_end}
         except Exception as exc:
             _LOGGER.error('Exception occured while fetching the program '
                           'guide for channel %s: %s', chan, exc)
-            import traceback
             traceback.print_exc()
-    # Set the program summaries asynchronously
-    tasks = [async_set_summary(prog) for prog in programs]
-    programs = await asyncio.gather(*tasks)
+            continue
+        programs.append(prog)
+        if not prog_url or prog_url in prog_urls:
+            continue
+        prog_urls.append(prog_url)
+        if prog_url in summary_tasks:
+            continue
+        # Start fetching the summary right away and yield to the event loop
+        # so that the request is in flight while the next cards get parsed
+        summary_tasks[prog_url] = asyncio.create_task(_async_fetch_summary(
+            prog_url, session, semaphore, refresh_interval, no_cache))
+        await asyncio.sleep(0)
+    results = await asyncio.gather(
+        *[summary_tasks[prog_url] for prog_url in prog_urls],
+        return_exceptions=True)
+    summaries = {}
+    for prog_url, res in zip(prog_urls, results):
+        if isinstance(res, (aiohttp.ClientError, asyncio.TimeoutError)):
+            _LOGGER.error('Failed to fetch the summary from %s: %s',
+                          prog_url, res)
+            continue
+        elif isinstance(res, BaseException):
+            raise res
+        summaries[prog_url] = res
+    for prog in programs:
+        prog['summary'] = summaries.get(prog.get('url'))
     if programs:
         if 'guide' not in _CACHE:
             _CACHE['guide'] = {}
-        _CACHE['guide'][chan] = {'last_updated': now, 'data': programs}
+        starts = [prog.get('start_time') for prog in programs]
+        if starts != sorted(starts):
+            starts = None
+        _CACHE['guide'][chan] = {'last_updated': now, 'data': programs,
+                                 'starts': starts}
     return programs
 
 
-async def async_get_current_program(channel, no_cache=False):
+async def async_get_current_program(channel, no_cache=False, http_cache=True):
     '''
     Get the current program info
     '''
-    chan = await async_determine_channel(channel)
-    guide = await async_get_program_guide(chan, no_cache)
+    chan = await async_determine_channel(channel, http_cache)
+    guide = await async_get_program_guide(chan, no_cache,
+                                          http_cache=http_cache)
     if not guide:
         _LOGGER.warning('Could not retrieve TV program for %s', channel)
         return
     now = datetime.datetime.now()
+    cache = _CACHE.get('guide', {}).get(chan, {})
+    starts = cache.get('starts')
+    if starts and cache.get('data') is guide:
+        # Sorted guide: binary search the last program that started
+        idx = bisect.bisect_right(starts, now) - 1
+        if idx < 0:
+            return
+        prog = guide[idx]
+        if now > prog.get('start_time') and now < prog.get('end_time'):
+            return prog
+        return
     for prog in guide:
         start = prog.get('start_time')
         end = prog.get('end_time')
@@ -260,12 +560,6 @@ async def async_get_current_program(channel, no_cache=False):
             return prog
 
 
-def _request_soup(*args, **kwargs):
-    loop = asyncio.get_event_loop()
-    res = loop.run_until_complete(_async_request_soup(*args, **kwargs))
-    return res
-
-
 def get_channels(*args, **kwargs):
     loop = asyncio.get_event_loop()
     res = loop.run_until_complete(async_get_channels(*args, **kwargs))
@@ -278,6 +572,12 @@ def get_program_guide(*args, **kwargs):
     return res
 
 
+def get_program_guides(*args, **kwargs):
+    loop = asyncio.get_event_loop()
+    res = loop.run_until_complete(async_get_program_guides(*args, **kwargs))
+    return res
+
+
 def get_current_program(*args, **kwargs):
     loop = asyncio.get_event_loop()
     res = loop.run_until_complete(async_get_current_program(*args, **kwargs))